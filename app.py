@@ -25,6 +25,12 @@ Data persistence:
     Task completions are scoped per user_oid (real Entra oid when using
     Bearer token; "_api_key" when using the legacy API key).
 
+Response caching:
+    Set REDIS_URL to cache GET /onboarding bodies per (department, user_oid)
+    for 5 minutes; POST /complete-task invalidates the caller's entries and
+    `seed.py --reset-completions` invalidates everyone's.
+    Without REDIS_URL the cache is a no-op.
+
 Error Responses:
     All errors return structured JSON so Copilot Studio can parse them
     and route to a fallback topic gracefully.
@@ -32,74 +38,427 @@ Error Responses:
 """
 
 import os
-
-from flask import Flask, jsonify, request
-
-from auth import get_caller_identity, require_auth
+from functools import lru_cache
+from typing import NamedTuple
+
+import orjson
+from flask import Flask, Response, request
+from flask_caching import Cache
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from auth import get_bearer_token, get_caller_identity, require_auth
 from database import db_session, init_db
 from graph import get_graph_user
 from models import Department, Employee, Task, TaskCompletion
 
+
+# ---------------------------------------------------------------------------
+# JSON serialisation — orjson-backed provider for jsonify()
+# ---------------------------------------------------------------------------
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson (Rust) instead of the stdlib encoder.
+    jsonify() picks it up automatically — no call-site changes needed.
+    Types orjson can't encode natively (e.g. Decimal) go through Flask's
+    DefaultJSONProvider.default, so output matches the stock provider.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 
 # ---------------------------------------------------------------------------
-# Database initialisation (runs once at startup)
+# Response cache — per-user GET /onboarding bodies, invalidated on completion
 # ---------------------------------------------------------------------------
 
-with app.app_context():
-    init_db()
-    # Auto-seed on first startup: if departments table is empty, populate all
-    # reference data. Safe on every startup — seed_all() skips existing rows.
-    from models import Department as _Dept
+# Redis when REDIS_URL is set; otherwise a no-op NullCache. An in-process
+# cache is deliberately not used: completions written by one gunicorn worker
+# couldn't invalidate the copies held by the others.
+_REDIS_URL = os.environ.get("REDIS_URL", "").strip()
+_ONBOARDING_CACHE_TTL = 300  # seconds
+
+cache = Cache(app, config=(
+    {"CACHE_TYPE": "RedisCache", "CACHE_REDIS_URL": _REDIS_URL}
+    if _REDIS_URL
+    else {"CACHE_TYPE": "NullCache", "CACHE_NO_NULL_WARNING": True}
+))
+
+
+# Cached bodies are never deleted in place. Keys embed two counters instead:
+# a global generation (bumped by `seed.py --reset-completions`) and a
+# per-user version (bumped after each new completion). A GET reads both
+# before it reads completions, so a body built from pre-commit data is
+# stored under a version nobody looks up any more and simply expires.
+_ONBOARDING_GENERATION_KEY = "onb-gen"
+# Per-user counters expire once idle: a version only has to outlive the
+# bodies stored under it, so a reset to 0 can never resurrect a stale one.
+_ONBOARDING_VERSION_TTL = 24 * 60 * 60
+
+
+def _onboarding_version_key(user_oid: str) -> str:
+    return f"onb-ver:{user_oid}"
+
+
+def _onboarding_cache_key(dept_name: str, user_oid: str) -> str:
+    """
+    Return the cache key for this user's current onboarding body.
+
+    A cache hit costs two Redis round trips (this MGET of the counters, then
+    the GET of the body) in place of the single indexed completions SELECT.
+    """
+    try:
+        generation, version = cache.get_many(
+            _ONBOARDING_GENERATION_KEY, _onboarding_version_key(user_oid)
+        )
+    except Exception as exc:
+        app.logger.warning("Response cache read failed (non-fatal): %s", exc)
+        generation = version = None
+    return f"onb:{generation or 0}:{version or 0}:{dept_name}:{user_oid}"
+
+
+def _cache_get(key: str) -> bytes | None:
+    """Best-effort cache read — a Redis outage degrades to a cache miss."""
+    try:
+        return cache.get(key)
+    except Exception as exc:
+        app.logger.warning("Response cache read failed (non-fatal): %s", exc)
+        return None
+
+
+def _cache_set(key: str, value: bytes, timeout: int) -> None:
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception as exc:
+        app.logger.warning("Response cache write failed (non-fatal): %s", exc)
+
+
+def invalidate_onboarding_cache(user_oid: str | None = None) -> None:
+    """
+    Retire cached onboarding bodies for one user, or for everyone when
+    user_oid is None. Must run after the completion change has committed.
+    """
+    if not _REDIS_URL:
+        return  # NullCache — nothing is ever stored
+    backend = cache.cache
+    try:
+        if user_oid is None:
+            backend.inc(_ONBOARDING_GENERATION_KEY)  # Redis INCR — atomic across workers
+        else:
+            # INCR + EXPIRE in one round trip, so idle users' counters don't
+            # accumulate in Redis.
+            key = backend.key_prefix + _onboarding_version_key(user_oid)
+            pipe = backend._write_client.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, _ONBOARDING_VERSION_TTL)
+            pipe.execute()
+    except Exception as exc:
+        app.logger.warning("Response cache invalidation failed: %s", exc)
+
+
+# ---------------------------------------------------------------------------
+# Database initialisation — a deploy step, not an import side effect
+# ---------------------------------------------------------------------------
+
+def bootstrap_db() -> None:
+    """
+    Create/migrate the schema, then seed reference data if the database is
+    empty. Safe to re-run — seed_all() skips existing rows.
+    """
     from seed import seed_all
-    _db = db_session()
-    if _db.query(_Dept).count() == 0:
-        app.logger.info("Database is empty — running initial seed.")
-        seed_all(_db)
+
+    init_db()
+    db = db_session()
+    try:
+        with db.begin():  # seed_all() opens its own transaction
+            is_empty = db.query(Department).count() == 0
+        if is_empty:
+            app.logger.info("Database is empty — running initial seed.")
+            seed_all(db)
+        else:
+            app.logger.info("Database already seeded — skipping.")
+    finally:
+        db_session.remove()
+
+
+@app.cli.command("seed")
+def seed_command() -> None:
+    """Create the schema and seed reference data: `flask seed`."""
+    bootstrap_db()
+
+
+# The schema is always created/migrated on import — with preload_app that
+# happens once in the gunicorn master, serialised by init_db()'s lock. Seeding
+# (and its departments count query) is left to `flask seed`; RUN_MIGRATIONS=1
+# also seeds on import for environments without that step.
+with app.app_context():
+    if os.environ.get("RUN_MIGRATIONS") == "1":
+        bootstrap_db()
     else:
-        app.logger.info("Database already seeded — skipping.")
-    db_session.remove()
+        init_db()
 
 
 @app.teardown_appcontext
 def shutdown_db_session(exception=None) -> None:
-    """Return the scoped session to the connection pool after each request."""
-    db_session.remove()
+    """
+    Return the scoped session to the connection pool after each request.
+
+    Requests that never touched the DB (health checks, 401s, 404s, cached
+    onboarding responses) have no session in the registry — skip the unwind.
+    """
+    if db_session.registry.has():
+        db_session.remove()
+
+
+# ---------------------------------------------------------------------------
+# Statements — built once at import, executed with bound parameters
+# ---------------------------------------------------------------------------
+
+# Module-level constructs skip rebuilding the statement tree per call and
+# always hit SQLAlchemy's compiled-SQL cache (keyed on statement structure).
+_STMT_COMPLETED_TASK_IDS = select(TaskCompletion.task_id).where(
+    TaskCompletion.user_oid == bindparam("user_oid"),
+    TaskCompletion.task_id.in_(bindparam("task_ids", expanding=True)),
+)
+# raiseload("*") turns any relationship not loaded up front into an error
+# instead of a silent per-row lazy SELECT.
+_STMT_DEPARTMENT_WITH_TASKS = (
+    select(Department)
+    .options(
+        # Tasks in one follow-up IN query (no lazy load), serialised columns only.
+        selectinload(Department.tasks).load_only(
+            Task.id, Task.task_key, Task.title, Task.description, Task.order,
+        ),
+        raiseload("*"),
+    )
+    .where(Department.name == bindparam("name"))
+)
+_STMT_EMPLOYEE_BY_NAME = (
+    select(Employee)
+    # Employee.to_dict() reads department.name — join it into the same query.
+    .options(joinedload(Employee.department), raiseload("*"))
+    .where(Employee.name == bindparam("name"))
+)
+_STMT_DEPARTMENT_NAMES = select(Department.name).order_by(Department.name)
+_STMT_INSERT_COMPLETION = insert(TaskCompletion)
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def error_response(code: str, message: str, status: int, details=None):
+def _json_response(data, status: int = 200) -> Response:
+    """
+    Serialise `data` with orjson and wrap it in a Response directly.
+    Skips jsonify's argument normalisation and indent/sort_keys branches.
+    """
+    body = orjson.dumps(data, default=DefaultJSONProvider.default, option=orjson.OPT_NON_STR_KEYS)
+    return Response(body, status=status, mimetype="application/json")
+
+
+# Errors whose body never varies, pre-serialised once: (code, status) -> (message, body).
+# error_response() serves these without building or encoding any dicts.
+_STATIC_ERRORS: dict[tuple[str, int], tuple[str, bytes]] = {
+    (code, status): (message, orjson.dumps({"error": {"code": code, "message": message, "details": None}}))
+    for code, message, status in (
+        ("NOT_FOUND", "The requested endpoint does not exist.", 404),
+        ("METHOD_NOT_ALLOWED", "HTTP method not allowed on this endpoint.", 405),
+        ("INTERNAL_SERVER_ERROR", "An unexpected error occurred. Please try again or contact support.", 500),
+        ("INVALID_REQUEST", "Request body must be valid JSON with 'task_id' and 'department' fields.", 400),
+        ("MISSING_FIELDS", "Both 'task_id' and 'department' are required.", 400),
+    )
+}
+
+
+def error_response(code: str, message: str, status: int, details=None) -> Response:
     """Return a structured JSON error response Copilot Studio can parse."""
-    return jsonify({"error": {"code": code, "message": message, "details": details}}), status
+    static = _STATIC_ERRORS.get((code, status))
+    if static is not None and details is None and static[0] == message:
+        return Response(static[1], status=status, mimetype="application/json")
+    return _json_response({"error": {"code": code, "message": message, "details": details}}, status)
 
 
-def _get_completed_task_ids(tasks: list[Task], user_oid: str) -> set[int]:
+def _get_completed_task_ids(task_ids: tuple[int, ...], user_oid: str) -> set[int]:
     """
-    Return the set of Task.id values already completed by this user_oid.
-    Single bulk query — avoids N+1 per task.
+    Return the subset of task_ids already completed by this user_oid.
+    Single bulk query — avoids N+1 per task. scalars() yields the ints
+    directly, with no Row wrapper per result.
     """
-    task_ids = [t.id for t in tasks]
     if not task_ids:
         return set()
-    completions = (
-        db_session.query(TaskCompletion.task_id)
-        .filter(
-            TaskCompletion.user_oid == user_oid,
-            TaskCompletion.task_id.in_(task_ids),
+    params = {"user_oid": user_oid, "task_ids": task_ids}
+    return set(db_session.scalars(_STMT_COMPLETED_TASK_IDS, params).all())
+
+
+def _record_completion(task_pk: int, user_oid: str) -> None:
+    """
+    Insert a TaskCompletion row, ignoring duplicates, and commit.
+
+    The unique (task_id, user_oid) index makes this atomic in one statement:
+    ON CONFLICT DO NOTHING on SQLite/Postgres; on SQL Server (no ON CONFLICT)
+    a plain INSERT whose duplicate-key error is swallowed.
+    """
+    values = {"task_id": task_pk, "user_oid": user_oid}
+    dialect = db_session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        stmt = (
+            dialect_insert(TaskCompletion)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=["task_id", "user_oid"])
         )
-        .all()
-    )
-    return {row.task_id for row in completions}
+        db_session.execute(stmt)
+        db_session.commit()
+        return
+
+    try:
+        db_session.execute(_STMT_INSERT_COMPLETION, values)
+        db_session.commit()
+    except IntegrityError:
+        db_session.rollback()  # Another request completed it first — no-op.
 
 
-def _completion_percentage(tasks: list[Task], completed_ids: set[int]) -> int:
-    if not tasks:
+def _completion_percentage(total: int, completed_ids: set[int]) -> int:
+    if not total:
         return 0
-    return round((len(completed_ids) / len(tasks)) * 100)
+    return round((len(completed_ids) / total) * 100)
+
+
+# ---------------------------------------------------------------------------
+# Reference data caches — built once per process on first use
+# ---------------------------------------------------------------------------
+
+# Departments, tasks, and employees are reference data written only by
+# seed.py, so lookups are memoised per worker process with lru_cache and
+# return plain detached values — never ORM instances bound to a session.
+# Only TaskCompletion rows are read live. Restart the app after re-seeding.
+
+class DepartmentRef(NamedTuple):
+    """Detached snapshot of a department and its ordered task templates."""
+
+    id: int
+    templates: tuple[tuple[int, dict], ...]  # (Task.id, task dict), by Task.order
+    task_ids: tuple[int, ...]                # Task.id values, by Task.order
+    task_ids_by_key: dict[str, int]          # "eng_001" -> Task.id
+
+
+@lru_cache(maxsize=16)
+def _get_department_cached(name_lower: str) -> DepartmentRef | None:
+    """
+    Return the department's reference data, or None if it doesn't exist.
+    Per-request work is then a shallow copy of each template plus the
+    user's `completed` flag — no ORM access after first use.
+    """
+    dept = db_session.execute(_STMT_DEPARTMENT_WITH_TASKS, {"name": name_lower}).scalar_one_or_none()
+    if not dept:
+        return None
+    return DepartmentRef(
+        id=dept.id,
+        templates=tuple((t.id, t.to_dict()) for t in dept.tasks),
+        task_ids=tuple(t.id for t in dept.tasks),
+        task_ids_by_key={t.task_key: t.id for t in dept.tasks},
+    )
+
+
+@lru_cache(maxsize=256)
+def _get_employee_cached(name_lower: str) -> dict:
+    """
+    Return the serialised employee record. Callers must copy before mutating.
+
+    Raises KeyError for unknown names: lru_cache doesn't cache exceptions, so
+    misses can't evict real employees, and a name seeded later is found.
+    """
+    employee = db_session.execute(_STMT_EMPLOYEE_BY_NAME, {"name": name_lower}).scalar_one_or_none()
+    if employee is None:
+        raise KeyError(name_lower)
+    return employee.to_dict()
+
+
+def _get_employee(name_lower: str) -> dict | None:
+    """Return the cached employee record, or None if there is no such employee."""
+    try:
+        return _get_employee_cached(name_lower)
+    except KeyError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _get_department_names() -> tuple[str, ...]:
+    """Return every department name (lowercase), sorted."""
+    return tuple(db_session.scalars(_STMT_DEPARTMENT_NAMES).all())
+
+
+def _get_department(name_lower: str) -> DepartmentRef | None:
+    """
+    Resolve a department by name. Unknown names are rejected against the
+    cached name list, so they never query the DB or evict real entries
+    from _get_department_cached's LRU.
+    """
+    if name_lower not in _get_department_names():
+        return None
+    return _get_department_cached(name_lower)
+
+
+@lru_cache(maxsize=1)
+def _get_valid_departments_msg() -> str:
+    """Return the "Engineering, Hr, …" list used in DEPARTMENT_NOT_FOUND errors."""
+    return ", ".join(name.title() for name in _get_department_names())
+
+
+def _build_task_list(templates, completed_ids: set[int]) -> tuple[list[dict], int]:
+    """
+    Stamp per-user completion state onto a department's task templates.
+
+    Returns (task dicts, index of the first incomplete task or -1). Tasks are
+    ordered, so the next task is found in the same pass that builds the list.
+    """
+    task_dicts = []
+    next_index = -1
+    for i, (task_id, tpl) in enumerate(templates):
+        completed = task_id in completed_ids
+        if not completed and next_index < 0:
+            next_index = i
+        task_dicts.append({**tpl, "completed": completed})
+    return task_dicts, next_index
+
+
+# Checklists longer than this are streamed task-by-task instead of being
+# serialised into one buffer. Today's departments have 4 tasks each.
+_STREAM_THRESHOLD = 64
+
+
+def _stream_onboarding(department_title: str, templates, completed_ids: set[int], pct: int):
+    """
+    Yield the GET /onboarding body in chunks — same JSON as the buffered path,
+    but constant memory and an earlier first byte for very long checklists.
+    Works only from plain values, so it is safe to run after the request ends.
+    """
+    next_task = None
+    yield b'{"department":' + orjson.dumps(department_title) + b',"tasks":['
+    for i, (task_id, tpl) in enumerate(templates):
+        completed = task_id in completed_ids
+        task = {**tpl, "completed": completed}
+        if not completed and next_task is None:
+            next_task = task
+        yield (b"," if i else b"") + orjson.dumps(task)
+    yield (
+        b'],"total_tasks":' + str(len(templates)).encode()
+        + b',"completion_percentage":' + str(pct).encode()
+        + b',"next_task":' + orjson.dumps(next_task) + b"}"
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -108,7 +467,7 @@ def _completion_percentage(tasks: list[Task], completed_ids: set[int]) -> int:
 
 @app.errorhandler(Exception)
 def handle_unexpected_error(e):
-    app.logger.error(f"Unhandled exception: {e}", exc_info=True)
+    app.logger.error("Unhandled exception: %s", e, exc_info=True)
     return error_response(
         code="INTERNAL_SERVER_ERROR",
         message="An unexpected error occurred. Please try again or contact support.",
@@ -128,7 +487,7 @@ def handle_405(e):
 # Routes
 # ---------------------------------------------------------------------------
 
-@app.route("/employee/<string:name>", methods=["GET"])
+@app.route("/employee/<string:name>", methods=["GET"], strict_slashes=False)
 @require_auth
 def get_employee(name: str):
     """
@@ -148,8 +507,7 @@ def get_employee(name: str):
 
     # --- Attempt 1: Microsoft Graph (real directory data via OBO) ---
     if identity["via_entra"]:
-        auth_header = request.headers.get("Authorization", "")
-        bearer_token = auth_header[len("Bearer "):] if auth_header.startswith("Bearer ") else None
+        bearer_token = get_bearer_token()
 
         if bearer_token:
             graph_data = get_graph_user(bearer_token)
@@ -171,13 +529,13 @@ def get_employee(name: str):
                         "upn": identity["upn"],
                     },
                 }
-                return jsonify(result), 200
+                return _json_response(result)
             else:
                 app.logger.warning("Graph OBO failed — falling back to database record.")
 
     # --- Attempt 2: Database fallback ---
-    employee = db_session.query(Employee).filter_by(name=name.lower()).first()
-    if not employee:
+    employee = _get_employee(name.lower())
+    if employee is None:
         return error_response(
             code="EMPLOYEE_NOT_FOUND",
             message=f"No employee record found for '{name}'. "
@@ -185,7 +543,7 @@ def get_employee(name: str):
             status=404,
         )
 
-    result = employee.to_dict()
+    result = dict(employee)
     result["source"] = "database"
 
     if identity["via_entra"]:
@@ -195,10 +553,10 @@ def get_employee(name: str):
             "upn": identity["upn"],
         }
 
-    return jsonify(result), 200
+    return _json_response(result)
 
 
-@app.route("/onboarding/<string:department>", methods=["GET"])
+@app.route("/onboarding/<string:department>", methods=["GET"], strict_slashes=False)
 @require_auth
 def get_onboarding_tasks(department: str):
     """
@@ -211,36 +569,52 @@ def get_onboarding_tasks(department: str):
     as before persistence was added). Entra ID callers each have independent
     per-user state — Jacob's progress is separate from Alex's.
     """
-    dept = db_session.query(Department).filter_by(name=department.lower()).first()
-    if not dept:
-        valid = [d.name.title() for d in db_session.query(Department).order_by(Department.name).all()]
+    dept = _get_department(department.lower())
+    if dept is None:
         return error_response(
             code="DEPARTMENT_NOT_FOUND",
             message=f"Department '{department}' is not recognised. "
-                    f"Valid values: {', '.join(valid)}.",
+                    f"Valid values: {_get_valid_departments_msg()}.",
             status=404,
         )
 
     identity = get_caller_identity()
     user_oid = identity["user_oid"]
 
-    tasks = dept.tasks  # ordered by Task.order
-    completed_ids = _get_completed_task_ids(tasks, user_oid)
-    pct = _completion_percentage(tasks, completed_ids)
+    # Copilot Studio often re-fetches the checklist between turns; serve the
+    # serialised body from cache until this user completes another task.
+    cache_key = _onboarding_cache_key(department.lower(), user_oid)
+    cached_body = _cache_get(cache_key)
+    if cached_body is not None:
+        return Response(cached_body, status=200, mimetype="application/json")
+
+    templates = dept.templates
+    completed_ids = _get_completed_task_ids(dept.task_ids, user_oid)
+    total = len(templates)
+    pct = _completion_percentage(total, completed_ids)
+
+    if total > _STREAM_THRESHOLD:
+        # Streamed bodies aren't cached — the cache needs the whole body.
+        return Response(
+            _stream_onboarding(department.title(), templates, completed_ids, pct),
+            status=200,
+            mimetype="application/json",
+        )
 
-    task_dicts = [t.to_dict(completed=t.id in completed_ids) for t in tasks]
-    next_task = next((t for t in tasks if t.id not in completed_ids), None)
+    task_dicts, next_index = _build_task_list(templates, completed_ids)
 
-    return jsonify({
+    response = _json_response({
         "department": department.title(),
         "tasks": task_dicts,
-        "total_tasks": len(tasks),
+        "total_tasks": total,
         "completion_percentage": pct,
-        "next_task": next_task.to_dict(completed=False) if next_task else None,
-    }), 200
+        "next_task": task_dicts[next_index] if next_index >= 0 else None,
+    })
+    _cache_set(cache_key, response.get_data(), timeout=_ONBOARDING_CACHE_TTL)
+    return response
 
 
-@app.route("/complete-task", methods=["POST"])
+@app.route("/complete-task", methods=["POST"], strict_slashes=False)
 @require_auth
 def complete_task():
     """
@@ -254,16 +628,29 @@ def complete_task():
         task_id    (str): ID of the task to mark complete (e.g. 'eng_001').
         department (str): Department the task belongs to.
     """
+    # get_json(silent=True) is None for non-JSON mimetypes and malformed bodies.
     body = request.get_json(silent=True)
-    if not body:
+    if not isinstance(body, dict) or not body:
         return error_response(
             code="INVALID_REQUEST",
             message="Request body must be valid JSON with 'task_id' and 'department' fields.",
             status=400,
         )
 
-    task_id = body.get("task_id", "").strip()
-    department = body.get("department", "").strip()
+    # null counts as missing; any other non-string value is malformed.
+    task_id = body.get("task_id")
+    department = body.get("department")
+    task_id = "" if task_id is None else task_id
+    department = "" if department is None else department
+    if not isinstance(task_id, str) or not isinstance(department, str):
+        return error_response(
+            code="INVALID_REQUEST",
+            message="'task_id' and 'department' must be strings.",
+            status=400,
+        )
+
+    task_id = task_id.strip()
+    department = department.strip()
 
     if not task_id or not department:
         return error_response(
@@ -273,8 +660,8 @@ def complete_task():
         )
 
     # Validate department
-    dept = db_session.query(Department).filter_by(name=department.lower()).first()
-    if not dept:
+    dept = _get_department(department.lower())
+    if dept is None:
         return error_response(
             code="DEPARTMENT_NOT_FOUND",
             message=f"Department '{department}' is not recognised.",
@@ -282,54 +669,72 @@ def complete_task():
         )
 
     # Validate task exists and belongs to this department
-    task = db_session.query(Task).filter_by(task_key=task_id, department_id=dept.id).first()
-    if not task:
-        valid_keys = [t.task_key for t in dept.tasks]
+    task_pk = dept.task_ids_by_key.get(task_id)
+    if task_pk is None:
         return error_response(
             code="TASK_NOT_FOUND",
             message=f"Task '{task_id}' not found in department '{department}'. "
-                    f"Valid task IDs: {', '.join(valid_keys)}.",
+                    f"Valid task IDs: {', '.join(dept.task_ids_by_key)}.",
             status=404,
         )
 
     identity = get_caller_identity()
     user_oid = identity["user_oid"]
 
+    # One completions query serves both the idempotency check and the
+    # response — the post-insert state is the prior set plus this task.
+    prior_completed_ids = _get_completed_task_ids(dept.task_ids, user_oid)
+
     # Mark complete — idempotent: skip if already completed for this user.
-    already_done = (
-        db_session.query(TaskCompletion)
-        .filter_by(task_id=task.id, user_oid=user_oid)
-        .first()
+    # The insert itself also tolerates a concurrent duplicate.
+    if task_pk not in prior_completed_ids:
+        _record_completion(task_pk, user_oid)
+        invalidate_onboarding_cache(user_oid)
+
+    completed_ids = prior_completed_ids | {task_pk}
+    pct = _completion_percentage(len(dept.templates), completed_ids)
+    next_task = next(
+        ({**tpl, "completed": False} for tid, tpl in dept.templates if tid not in completed_ids),
+        None,
     )
-    if not already_done:
-        completion = TaskCompletion(task_id=task.id, user_oid=user_oid)
-        db_session.add(completion)
-        db_session.commit()
-
-    # Build updated task list for response
-    tasks = dept.tasks
-    completed_ids = _get_completed_task_ids(tasks, user_oid)
-    pct = _completion_percentage(tasks, completed_ids)
-    next_task = next((t for t in tasks if t.id not in completed_ids), None)
 
-    return jsonify({
+    return _json_response({
         "task_id": task_id,
         "completed": True,
         "department": department.title(),
         "completion_percentage": pct,
-        "remaining_tasks": len(tasks) - len(completed_ids),
+        "remaining_tasks": len(dept.templates) - len(completed_ids),
         "all_complete": pct == 100,
-        "next_task": next_task.to_dict(completed=False) if next_task else None,
-    }), 200
+        "next_task": next_task,
+    })
 
 
 # ---------------------------------------------------------------------------
 # Health check — used by Azure App Service to verify the app is running
 # ---------------------------------------------------------------------------
 
-@app.route("/health", methods=["GET"])
-def health():
-    return jsonify({"status": "ok"}), 200
+# Answered by WSGI middleware in front of Flask: App Service probes this
+# constantly, so it skips routing, request hooks and app-context teardown.
+_HEALTH_BODY = b'{"status":"ok"}'
+_HEALTH_HEADERS = [
+    ("Content-Type", "application/json"),
+    ("Content-Length", str(len(_HEALTH_BODY))),
+]
+
+
+class _HealthCheckMiddleware:
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        method = environ.get("REQUEST_METHOD")
+        if environ.get("PATH_INFO") == "/health" and method in ("GET", "HEAD"):
+            start_response("200 OK", _HEALTH_HEADERS)
+            return [_HEALTH_BODY if method == "GET" else b""]
+        return self.wsgi_app(environ, start_response)
+
+
+app.wsgi_app = _HealthCheckMiddleware(app.wsgi_app)
 
 
 # ---------------------------------------------------------------------------
@@ -22,19 +22,44 @@ Caller identity is stored in Flask's request-scoped `g` object so route
 handlers can access it via `get_caller_identity()` without passing it around.
 """
 
+import hashlib
+import hmac
 import logging
 import os
+import threading
+import time
 from functools import wraps
 from typing import Optional
 
-from flask import g, jsonify, request
+import orjson
+from flask import Response, g, request
 
 logger = logging.getLogger(__name__)
 
+# App Service injects env vars at process start, so auth config is read once
+# at import rather than on every request. See _reload_auth_config().
+_API_KEY_BYTES = b""
+_ENTRA_TENANT_ID = ""
+_ENTRA_CLIENT_ID = ""
+
+
+def _reload_auth_config() -> None:
+    """Re-read API_KEY / ENTRA_* from the environment (for tests and scripts)."""
+    global _API_KEY_BYTES, _ENTRA_TENANT_ID, _ENTRA_CLIENT_ID, _jwks_client
+    _API_KEY_BYTES = os.environ.get("API_KEY", "").strip().encode()
+    _ENTRA_TENANT_ID = os.environ.get("ENTRA_TENANT_ID", "").strip()
+    _ENTRA_CLIENT_ID = os.environ.get("ENTRA_CLIENT_ID", "").strip()
+    _jwks_client = None
+    _signing_keys.clear()
+    with _token_cache_lock:
+        _token_cache.clear()
+
+
 # ---------------------------------------------------------------------------
 # JWKS client — lazy-initialised once per process, caches keys for 1 hour
 # ---------------------------------------------------------------------------
 
+_JWKS_LIFESPAN = 3600  # seconds
 _jwks_client = None
 
 
@@ -44,7 +69,7 @@ def _get_jwks_client():
     if _jwks_client is not None:
         return _jwks_client
 
-    tenant_id = os.environ.get("ENTRA_TENANT_ID", "").strip()
+    tenant_id = _ENTRA_TENANT_ID
     if not tenant_id:
         return None
 
@@ -55,7 +80,7 @@ def _get_jwks_client():
             f"https://login.microsoftonline.com/{tenant_id}"
             f"/discovery/v2.0/keys"
         )
-        _jwks_client = jwt.PyJWKClient(jwks_url, cache_jwk_set=True, lifespan=3600)
+        _jwks_client = jwt.PyJWKClient(jwks_url, cache_jwk_set=True, lifespan=_JWKS_LIFESPAN)
         logger.info(f"JWKS client initialised for tenant {tenant_id}")
         return _jwks_client
     except Exception as exc:
@@ -63,6 +88,67 @@ def _get_jwks_client():
         return None
 
 
+# Public keys by JWKS kid, each kept no longer than the JWKS client's own
+# lifespan — a key Entra removes from its set (rollover or revocation) stops
+# validating within the hour, just as it would without this memo.
+_signing_keys: dict[str, tuple[object, float]] = {}
+
+
+def _signing_key_for_kid(kid: str):
+    """
+    Return the public key for a JWKS key id.
+
+    Entra signs with a handful of rotating keys, so resolving each kid once
+    per _JWKS_LIFESPAN leaves only the RS256 verify on the hot path. Unknown
+    kids raise and are not cached, which lets PyJWKClient refetch the set.
+    """
+    now = time.time()
+    entry = _signing_keys.get(kid)
+    if entry and now - entry[1] < _JWKS_LIFESPAN:
+        return entry[0]
+    key = _get_jwks_client().get_signing_key(kid).key
+    _signing_keys[kid] = (key, now)
+    return key
+
+
+# ---------------------------------------------------------------------------
+# Validated-token cache — one RS256 verify per token, not per request
+# ---------------------------------------------------------------------------
+
+# Copilot Studio reuses the same Bearer token for every call in a conversation,
+# so verified claims are memoised by a digest of the token. Entries expire at
+# the token's own `exp`, capped at _TOKEN_CACHE_TTL seconds.
+_TOKEN_CACHE_TTL = 300
+_TOKEN_CACHE_MAX = 10_000
+_token_cache: dict[bytes, tuple[dict, float]] = {}
+_token_cache_lock = threading.Lock()
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _get_cached_claims(token: str) -> Optional[dict]:
+    """Return previously validated claims for this token, or None if absent/expired."""
+    entry = _token_cache.get(_token_digest(token))
+    if entry and entry[1] > time.time():
+        return entry[0]
+    return None
+
+
+def _cache_claims(token: str, claims: dict) -> None:
+    now = time.time()
+    expires_at = min(float(claims.get("exp", now)), now + _TOKEN_CACHE_TTL)
+    with _token_cache_lock:
+        if len(_token_cache) >= _TOKEN_CACHE_MAX:
+            # Drop expired entries first; if the cache is still full, start over.
+            for key in [k for k, (_, exp) in _token_cache.items() if exp <= now]:
+                del _token_cache[key]
+            if len(_token_cache) >= _TOKEN_CACHE_MAX:
+                _token_cache.clear()
+        _token_cache[_token_digest(token)] = (claims, expires_at)
+
+
 # ---------------------------------------------------------------------------
 # Token validation
 # ---------------------------------------------------------------------------
@@ -73,14 +159,21 @@ def _validate_bearer_token(token: str) -> Optional[dict]:
 
     Returns the decoded claims dict on success, None on any failure.
     Never raises — all errors are caught and logged.
+
+    Successful validations are cached (see _get_cached_claims), so repeat
+    requests with the same token skip the signature check.
     """
-    tenant_id = os.environ.get("ENTRA_TENANT_ID", "").strip()
-    client_id = os.environ.get("ENTRA_CLIENT_ID", "").strip()
+    tenant_id = _ENTRA_TENANT_ID
+    client_id = _ENTRA_CLIENT_ID
 
     if not tenant_id or not client_id:
         logger.debug("Bearer token present but ENTRA config missing — skipping validation.")
         return None
 
+    cached = _get_cached_claims(token)
+    if cached is not None:
+        return cached
+
     jwks_client = _get_jwks_client()
     if not jwks_client:
         return None
@@ -88,7 +181,7 @@ def _validate_bearer_token(token: str) -> Optional[dict]:
     try:
         import jwt  # PyJWT
 
-        signing_key = jwks_client.get_signing_key_from_jwt(token)
+        signing_key = _signing_key_for_kid(jwt.get_unverified_header(token)["kid"])
 
         # Accept both v2.0 and v1.0 issuers — Power Platform's AAD connector
         # type may use either endpoint depending on how the Authorization URL
@@ -116,12 +209,13 @@ def _validate_bearer_token(token: str) -> Optional[dict]:
                 try:
                     claims = jwt.decode(
                         token,
-                        signing_key.key,
+                        signing_key,
                         algorithms=["RS256"],
                         audience=audience,
                         issuer=issuer,
                     )
                     logger.debug(f"Token validated — audience: {audience}, issuer: {issuer}")
+                    _cache_claims(token, claims)
                     return claims
                 except Exception as exc:
                     last_exc = exc
@@ -163,6 +257,15 @@ def get_caller_identity() -> dict:
     )
 
 
+def get_bearer_token() -> Optional[str]:
+    """
+    Return the raw Bearer token require_auth validated for this request, or
+    None when the caller authenticated another way. Used for the Graph OBO
+    exchange, so the Authorization header is parsed in one place only.
+    """
+    return getattr(g, "bearer_token", None)
+
+
 # ---------------------------------------------------------------------------
 # Auth decorator
 # ---------------------------------------------------------------------------
@@ -181,9 +284,8 @@ def require_auth(f):
     def decorated(*args, **kwargs):
 
         # --- 1. Try Bearer token (Entra ID) ---
-        auth_header = request.headers.get("Authorization", "")
-        if auth_header.startswith("Bearer "):
-            token = auth_header[len("Bearer "):]
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme == "Bearer" and token:
             claims = _validate_bearer_token(token)
 
             if claims:
@@ -193,6 +295,7 @@ def require_auth(f):
                     "upn": claims.get("preferred_username"),
                     "via_entra": True,
                 }
+                g.bearer_token = token
                 return f(*args, **kwargs)
 
             # A Bearer header was sent but validation failed — reject outright.
@@ -204,10 +307,9 @@ def require_auth(f):
             )
 
         # --- 2. Fall back to API key ---
-        expected = os.environ.get("API_KEY", "").strip()
         provided = request.headers.get("X-API-Key", "").strip()
 
-        if not expected:
+        if not _API_KEY_BYTES:
             # Local development: no API_KEY configured — allow through with a warning.
             from flask import current_app
             current_app.logger.warning(
@@ -221,7 +323,8 @@ def require_auth(f):
             }
             return f(*args, **kwargs)
 
-        if provided and provided == expected:
+        # Constant-time comparison — don't leak key prefixes via response timing.
+        if provided and hmac.compare_digest(provided.encode(), _API_KEY_BYTES):
             g.caller_identity = {
                 "user_oid": "_api_key",
                 "name": "API Key User",
@@ -240,5 +343,16 @@ def require_auth(f):
     return decorated
 
 
+# Auth failures use a handful of fixed messages — serialise each body once.
+_auth_error_bodies: dict[tuple[str, str], bytes] = {}
+
+
 def _auth_error(code: str, message: str):
-    return jsonify({"error": {"code": code, "message": message, "details": None}}), 401
+    body = _auth_error_bodies.get((code, message))
+    if body is None:
+        body = orjson.dumps({"error": {"code": code, "message": message, "details": None}})
+        _auth_error_bodies[(code, message)] = body
+    return Response(body, status=401, mimetype="application/json")
+
+
+_reload_auth_config()
@@ -4,6 +4,11 @@ database.py — SQLAlchemy engine and session configuration.
 Environment variables:
     DATABASE_URL    Full connection string for the target database.
                     If unset, falls back to a local SQLite file (onboarding_dev.db).
+    DB_POOL_SIZE    Persistent connections per worker process (default 10).
+    DB_MAX_OVERFLOW Extra burst connections per worker process (default 10).
+    SQLITE_WAL      Set to 1 to run a SQLite database in WAL mode. Only for a
+                    local disk: WAL needs shared memory, which network shares
+                    (App Service's /home) don't support. Default: off.
 
 Supported backends:
     Local dev (default, zero config):
@@ -20,21 +25,74 @@ Session lifecycle in Flask:
 
 import logging
 import os
+from contextlib import contextmanager
 
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import Date, create_engine, event, inspect, text
+from sqlalchemy.exc import NoSuchTableError
 from sqlalchemy.orm import scoped_session, sessionmaker
 
+try:
+    import fcntl
+except ImportError:  # Windows dev machines — single process, no file lock
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 _SQLITE_FALLBACK = "sqlite:///onboarding_dev.db"
 
+# Applied to every new SQLite connection. busy_timeout makes concurrent
+# writers (gthread workers, seed.py) wait for the lock instead of failing
+# with SQLITE_BUSY.
+_SQLITE_PRAGMAS = (
+    "PRAGMA cache_size=-16000",    # ~16 MB page cache per connection
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",    # ms
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Opt-in (SQLITE_WAL=1), local disks only: lets readers proceed while a write
+# is in progress. The default rollback journal is the one that is safe on the
+# SMB share App Service mounts at /home.
+_SQLITE_WAL_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",   # durable in WAL mode, far fewer fsyncs
+)
+_SQLITE_WAL = os.environ.get("SQLITE_WAL") == "1"
+
+
+def _set_sqlite_pragmas(dbapi_conn, _connection_record) -> None:
+    pragmas = _SQLITE_PRAGMAS + _SQLITE_WAL_PRAGMAS if _SQLITE_WAL else _SQLITE_PRAGMAS
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma in pragmas:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 def _build_engine():
     url = os.environ.get("DATABASE_URL", _SQLITE_FALLBACK)
-    kwargs: dict = {"pool_pre_ping": True}
+    # Bulk INSERTs (seed.py) are sent as multi-VALUES statements of at most
+    # this many rows; dialects also cap the bound-parameter count per batch.
+    kwargs: dict = {"pool_pre_ping": True, "insertmanyvalues_page_size": 500}
     if url.startswith("sqlite"):
         kwargs["connect_args"] = {"check_same_thread": False}
-    return create_engine(url, **kwargs)
+    else:
+        # Server databases (Azure SQL): one pool per gunicorn worker, sized to
+        # cover its 8 request threads. pool_recycle stays under Azure SQL's
+        # ~30 min idle disconnect; LIFO reuses warm connections so idle ones
+        # age out instead of paying a fresh TCP+TLS handshake.
+        kwargs.update(
+            pool_size=int(os.environ.get("DB_POOL_SIZE", 10)),
+            max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+            pool_recycle=1800,
+            pool_timeout=10,
+            pool_use_lifo=True,
+        )
+    engine = create_engine(url, **kwargs)
+    if url.startswith("sqlite"):
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
 
 
 engine = _build_engine()
@@ -42,15 +100,76 @@ SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 db_session = scoped_session(SessionLocal)
 
 
+# Arbitrary constant shared by every process that migrates this database.
+_SCHEMA_LOCK_KEY = 0x0B0A_2D01
+_SCHEMA_LOCK_NAME = "onboarding_schema_migration"
+
+
+@contextmanager
+def _schema_lock():
+    """
+    Serialise init_db() across processes (gunicorn workers, seed.py, app
+    instances) so only one runs DDL at a time; the rest wait, then find the
+    schema current and no-op.
+
+    Postgres and SQL Server use a session-level advisory/app lock held on a
+    dedicated connection. SQLite uses an flock on a sentinel file next to the
+    database, since its own locks would block the migration's connections.
+    """
+    dialect = engine.dialect.name
+
+    if dialect == "sqlite":
+        db_path = engine.url.database
+        if fcntl is None or not db_path or db_path == ":memory:":
+            yield
+            return
+        with open(f"{db_path}.migrate.lock", "w") as sentinel:
+            fcntl.flock(sentinel, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(sentinel, fcntl.LOCK_UN)
+        return
+
+    if dialect == "postgresql":
+        acquire = text("SELECT pg_advisory_lock(:key)").bindparams(key=_SCHEMA_LOCK_KEY)
+        release = text("SELECT pg_advisory_unlock(:key)").bindparams(key=_SCHEMA_LOCK_KEY)
+    elif dialect == "mssql":
+        # sp_getapplock reports failure (timeout, deadlock) via its return
+        # code rather than an error, so surface it as a result row.
+        acquire = text(
+            "SET NOCOUNT ON; DECLARE @r int; "
+            "EXEC @r = sp_getapplock @Resource = :name, @LockMode = 'Exclusive', "
+            "@LockOwner = 'Session', @LockTimeout = 60000; SELECT @r"
+        ).bindparams(name=_SCHEMA_LOCK_NAME)
+        release = text(
+            "EXEC sp_releaseapplock @Resource = :name, @LockOwner = 'Session'"
+        ).bindparams(name=_SCHEMA_LOCK_NAME)
+    else:
+        yield
+        return
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        status = conn.execute(acquire).scalar()
+        if dialect == "mssql" and status < 0:
+            raise RuntimeError(f"sp_getapplock failed for {_SCHEMA_LOCK_NAME!r} (status {status})")
+        try:
+            yield
+        finally:
+            conn.execute(release)
+
+
 def init_db() -> None:
     """
     Create all tables defined in models.py if they don't already exist.
     Then run migrate_db() to apply any schema changes to existing tables.
-    Safe to call on every startup.
+    Safe to call on every startup, including from several processes at once
+    (see _schema_lock).
     """
     from models import Base
-    Base.metadata.create_all(bind=engine)
-    migrate_db()
+    with _schema_lock():
+        Base.metadata.create_all(bind=engine)
+        migrate_db()
 
 
 def migrate_db() -> None:
@@ -62,27 +181,163 @@ def migrate_db() -> None:
         task_completions.user_oid (VARCHAR 50) was added to scope completions
         per user. The old schema had a UNIQUE constraint on task_id alone (one
         global completion per task). The new schema allows one completion per
-        (task_id, user_oid) pair with no DB-level constraint (enforced in app).
+        (task_id, user_oid) pair, enforced by the uq_task_completions_task_user
+        unique index (see below).
+
+        Strategy: if user_oid column is missing, add it with ALTER TABLE and a
+        '_api_key' default, so existing (global) completions carry over as
+        API-key completions. The old task_id-only UNIQUE constraint is then
+        dropped — on SQLite, which can't drop constraints, by rebuilding the
+        table and copying the rows across.
+
+    Unique completions index:
+        uq_task_completions_task_user on (task_id, user_oid) lets /complete-task
+        insert with ON CONFLICT DO NOTHING. create_all() never adds indexes to
+        an existing table, so it is created here — after deleting duplicate
+        rows (keeping the earliest) that the old SELECT-then-INSERT path could
+        have left behind under concurrent requests.
+
+    Task list index:
+        ix_tasks_department_order on tasks (department_id, order) backs the
+        department task-list query. Added the same way; no data changes.
 
-        Strategy: if user_oid column is missing, drop and recreate the table.
-        Any existing completion rows are lost — acceptable for a dev/demo system
-        where completion data is not authoritative.
+    Completion timestamps:
+        task_completions.completed_at is now filled by the database
+        (server_default CURRENT_TIMESTAMP) instead of Python. Existing tables
+        get the column default via ALTER; SQLite rebuilds the table.
+
+    Employee start dates:
+        employees.start_date moved from VARCHAR(20) to DATE. Postgres and
+        SQL Server convert the column in place (values are ISO "YYYY-MM-DD").
+        SQLite needs nothing: it stores DATE as that same ISO text.
     """
+    # One inspector for the whole run. Its reflection cache is cleared only
+    # after DDL, so an up-to-date schema costs one catalog round trip per
+    # check (columns, indexes) and no separate has_table() probe.
     insp = inspect(engine)
 
-    if not insp.has_table("task_completions"):
+    try:
+        existing_columns = {col["name"] for col in insp.get_columns("task_completions")}
+    except NoSuchTableError:
         return  # Table doesn't exist yet — create_all() will handle it.
 
-    existing_columns = {col["name"] for col in insp.get_columns("task_completions")}
-
     if "user_oid" not in existing_columns:
         logger.info(
-            "Schema migration: task_completions missing user_oid column. "
-            "Dropping and recreating table (completion history will be reset)."
+            "Schema migration: adding user_oid column to task_completions "
+            "(existing completions are kept as API-key completions)."
         )
+        # SQL Server's ALTER TABLE takes ADD <column>, not ADD COLUMN.
+        add = "ADD" if engine.dialect.name == "mssql" else "ADD COLUMN"
         with engine.begin() as conn:
-            conn.execute(text("DROP TABLE task_completions"))
+            conn.execute(text(
+                f"ALTER TABLE task_completions {add} "
+                "user_oid VARCHAR(50) NOT NULL DEFAULT '_api_key'"
+            ))
+        _drop_task_id_unique(insp)
+        insp.clear_cache()
+        logger.info("Schema migration complete: task_completions.user_oid added.")
 
-        from models import Base
-        Base.metadata.create_all(bind=engine)
-        logger.info("Schema migration complete: task_completions recreated with user_oid.")
+    existing_indexes = {ix["name"] for ix in insp.get_indexes("task_completions")}
+
+    if "uq_task_completions_task_user" not in existing_indexes:
+        logger.info(
+            "Schema migration: adding unique (task_id, user_oid) index to "
+            "task_completions (duplicate completion rows will be removed)."
+        )
+        with engine.begin() as conn:
+            conn.execute(text(
+                "DELETE FROM task_completions WHERE id NOT IN ("
+                "SELECT MIN(id) FROM task_completions GROUP BY task_id, user_oid)"
+            ))
+
+        from models import TaskCompletion
+        for index in TaskCompletion.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+        logger.info("Schema migration complete: task_completions unique index created.")
+
+    completed_at = next(
+        col for col in insp.get_columns("task_completions") if col["name"] == "completed_at"
+    )
+    if completed_at["default"] is None:
+        logger.info("Schema migration: adding a server default to task_completions.completed_at.")
+        if engine.dialect.name == "sqlite":
+            _rebuild_task_completions()
+        else:
+            if engine.dialect.name == "mssql":
+                alter = (
+                    "ALTER TABLE task_completions ADD CONSTRAINT "
+                    "df_task_completions_completed_at DEFAULT CURRENT_TIMESTAMP FOR completed_at"
+                )
+            else:
+                alter = (
+                    "ALTER TABLE task_completions "
+                    "ALTER COLUMN completed_at SET DEFAULT CURRENT_TIMESTAMP"
+                )
+            with engine.begin() as conn:
+                conn.execute(text(alter))
+        logger.info("Schema migration complete: completed_at defaults to the database clock.")
+
+    if "ix_tasks_department_order" not in {ix["name"] for ix in insp.get_indexes("tasks")}:
+        logger.info("Schema migration: adding (department_id, order) index to tasks.")
+        from models import Task
+        for index in Task.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+        logger.info("Schema migration complete: tasks index created.")
+
+    if engine.dialect.name in ("postgresql", "mssql"):
+        start_date = next(
+            (col for col in insp.get_columns("employees") if col["name"] == "start_date"), None
+        )
+        if start_date is not None and not isinstance(start_date["type"], Date):
+            logger.info("Schema migration: converting employees.start_date to DATE.")
+            if engine.dialect.name == "postgresql":
+                alter = (
+                    "ALTER TABLE employees ALTER COLUMN start_date TYPE DATE "
+                    "USING start_date::date"
+                )
+            else:
+                alter = "ALTER TABLE employees ALTER COLUMN start_date DATE"
+            with engine.begin() as conn:
+                conn.execute(text(alter))
+            logger.info("Schema migration complete: employees.start_date is DATE.")
+
+
+def _drop_task_id_unique(insp) -> None:
+    """Remove the pre-Entra UNIQUE(task_id) constraint from task_completions."""
+    legacy = [
+        uc["name"]
+        for uc in insp.get_unique_constraints("task_completions")
+        if uc["column_names"] == ["task_id"]
+    ]
+    if not legacy:
+        return
+
+    if engine.dialect.name != "sqlite" and all(legacy):
+        with engine.begin() as conn:
+            for name in legacy:
+                conn.execute(text(f"ALTER TABLE task_completions DROP CONSTRAINT {name}"))
+        return
+
+    _rebuild_task_completions()
+
+
+def _rebuild_task_completions() -> None:
+    """
+    SQLite can't drop constraints or change column defaults, so recreate
+    task_completions under the current model definition and copy the rows
+    across. Orphans (task since deleted) are left behind — foreign_keys=ON
+    rejects them.
+    """
+    from models import TaskCompletion
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE task_completions RENAME TO task_completions_old"))
+        # Indexes follow a renamed table; free their names for the new one.
+        for index in TaskCompletion.__table__.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        TaskCompletion.__table__.create(bind=conn)
+        conn.execute(text(
+            "INSERT INTO task_completions (id, task_id, user_oid, completed_at) "
+            "SELECT id, task_id, user_oid, completed_at FROM task_completions_old "
+            "WHERE task_id IN (SELECT id FROM tasks)"
+        ))
+        conn.execute(text("DROP TABLE task_completions_old"))
@@ -23,9 +23,11 @@ Never raises — all errors are caught and logged.
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import msal
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +35,15 @@ logger = logging.getLogger(__name__)
 _GRAPH_BASE = "https://graph.microsoft.com/v1.0"
 _USER_SELECT = "displayName,givenName,surname,department,jobTitle,officeLocation,mail,userPrincipalName"
 
+# One keep-alive connection pool for all Graph calls, so requests after the
+# first skip the TCP + TLS handshake. Sized for a gthread worker's threads.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# /me/manager is fetched on this pool while /me runs on the request thread,
+# so the two Graph round trips overlap instead of running back to back.
+_graph_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="graph")
+
 # MSAL ConfidentialClientApplication is safe to reuse across requests —
 # it caches tokens internally and handles refresh automatically.
 _msal_app = None
@@ -121,9 +132,11 @@ def get_graph_user(user_bearer_token: str) -> dict | None:
 
     headers = {"Authorization": f"Bearer {graph_token}"}
 
+    manager_future = _graph_pool.submit(_get_manager_name, headers)
+
     # --- Fetch user profile ---
     try:
-        resp = requests.get(
+        resp = _http.get(
             f"{_GRAPH_BASE}/me",
             headers=headers,
             params={"$select": _USER_SELECT},
@@ -135,20 +148,7 @@ def get_graph_user(user_bearer_token: str) -> dict | None:
         logger.warning(f"Graph /me call failed: {exc}")
         return None
 
-    # --- Fetch manager (best-effort — not all users have one) ---
-    manager_name = None
-    try:
-        mgr_resp = requests.get(
-            f"{_GRAPH_BASE}/me/manager",
-            headers=headers,
-            params={"$select": "displayName"},
-            timeout=5,
-        )
-        if mgr_resp.status_code == 200:
-            manager_name = mgr_resp.json().get("displayName")
-        # 404 means no manager set — that's fine, leave manager_name as None.
-    except Exception as exc:
-        logger.debug(f"Graph /me/manager call failed (non-fatal): {exc}")
+    manager_name = manager_future.result()
 
     return {
         "full_name": user.get("displayName") or "",
@@ -160,3 +160,20 @@ def get_graph_user(user_bearer_token: str) -> dict | None:
         "upn": user.get("userPrincipalName"),
         "manager": manager_name,
     }
+
+
+def _get_manager_name(headers: dict) -> str | None:
+    """Fetch the user's manager's display name (best-effort — not all users have one)."""
+    try:
+        mgr_resp = _http.get(
+            f"{_GRAPH_BASE}/me/manager",
+            headers=headers,
+            params={"$select": "displayName"},
+            timeout=5,
+        )
+        if mgr_resp.status_code == 200:
+            return mgr_resp.json().get("displayName")
+        # 404 means no manager set — that's fine, return None.
+    except Exception as exc:
+        logger.debug(f"Graph /me/manager call failed (non-fatal): {exc}")
+    return None
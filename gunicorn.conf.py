@@ -0,0 +1,48 @@
+"""
+gunicorn.conf.py — Gunicorn settings for Azure App Service.
+
+Loaded automatically by `gunicorn app:app` from the project root (see
+startup.txt). Command-line flags still override anything set here.
+
+The API is I/O-bound — database round trips plus JWKS / Graph HTTPS calls —
+so each worker runs a thread pool (gthread) to overlap those waits instead of
+serving one request at a time. db_session is a thread-local scoped_session,
+so per-request teardown stays correct. gevent is deliberately not used:
+pyodbc (Azure SQL) is a C extension that monkey-patching can't make
+cooperative.
+
+preload_app imports the app once in the master before forking, so workers
+share its memory and the import-time schema bootstrap runs once rather than
+per worker. post_fork then discards the engine's inherited connection pool —
+sockets must never be shared across processes.
+
+SQLite (the default, and the Azure App Service setup) allows one writer at a
+time per file, so extra processes only contend for its lock: without a
+server DATABASE_URL the default is a single worker, with its threads still
+overlapping reads and network waits.
+
+Environment variables:
+    WEB_CONCURRENCY   Worker process count (default: 1 on SQLite,
+                      2 × CPU cores + 1 on a server database)
+    GUNICORN_THREADS  Threads per worker (default: 8)
+"""
+
+import multiprocessing
+import os
+
+bind = "0.0.0.0:8000"
+worker_class = "gthread"
+if "WEB_CONCURRENCY" in os.environ:
+    workers = int(os.environ["WEB_CONCURRENCY"])
+elif os.environ.get("DATABASE_URL", "sqlite").startswith("sqlite"):
+    workers = 1
+else:
+    workers = multiprocessing.cpu_count() * 2 + 1
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+worker_connections = 1000
+preload_app = True
+
+
+def post_fork(server, worker):
+    from database import engine
+    engine.dispose(close=False)
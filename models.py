@@ -18,9 +18,7 @@ Per-user completion scoping:
     ORM can't filter a relationship by request context automatically.
 """
 
-from datetime import datetime
-
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -49,9 +47,16 @@ class Task(Base):
     Completion state is NOT stored on this model — it is user-scoped and lives
     in TaskCompletion. Route handlers look up completed task IDs for the current
     caller and pass `completed=True/False` into to_dict() explicitly.
+
+    Existing databases get ix_tasks_department_order from database.migrate_db().
     """
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Serves the department's task list (department_id IN (...) ORDER BY
+        # order) as an index range scan. task_key is already unique on its own.
+        Index("ix_tasks_department_order", "department_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True)
     task_key = Column(String(20), unique=True, nullable=False)  # "eng_001", "sal_002", …
@@ -93,7 +98,7 @@ class Employee(Base):
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=False)
     manager = Column(String(100))
     team = Column(String(100))
-    start_date = Column(String(20))   # ISO date string "YYYY-MM-DD"
+    start_date = Column(Date)
     office = Column(String(100))
 
     department = relationship("Department", back_populates="employees")
@@ -106,7 +111,7 @@ class Employee(Base):
             "department": self.department.name.title(),
             "manager": self.manager,
             "team": self.team,
-            "start_date": self.start_date,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
             "office": self.office,
         }
 
@@ -123,18 +128,21 @@ class TaskCompletion(Base):
         - "_api_key" when the request uses the legacy X-API-Key header.
         - "_dev"     in local dev when no API_KEY env var is set.
 
-    There is intentionally no UNIQUE constraint on (task_id, user_oid) at the
-    DB level — the application layer prevents duplicate insertions via an
-    existence check before inserting. A formal constraint and Alembic migration
-    will be added in a later session.
+    A unique index on (task_id, user_oid) lets the database reject duplicate
+    completions atomically, so /complete-task can insert with ON CONFLICT DO
+    NOTHING instead of racing a SELECT-then-INSERT. Existing databases get
+    the index from database.migrate_db().
     """
 
     __tablename__ = "task_completions"
+    __table_args__ = (
+        Index("uq_task_completions_task_user", "task_id", "user_oid", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
     user_oid = Column(String(50), nullable=False, default="_api_key")
-    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     task = relationship("Task")
 
@@ -13,7 +13,11 @@ To reset all completion state only (without touching employees/tasks):
 """
 
 import argparse
+import os
 import sys
+from datetime import date
+
+from sqlalchemy import delete, insert, select, text
 
 from database import SessionLocal, init_db
 from models import Department, Employee, Task, TaskCompletion
@@ -226,69 +230,115 @@ EMPLOYEES: list[dict] = [
 # ---------------------------------------------------------------------------
 
 def seed_all(db) -> None:
-    """Insert departments, tasks, and employees. Skip rows that already exist."""
-    dept_map: dict[str, Department] = {}
-
-    # --- Departments ---
-    for dept_name in DEPARTMENTS:
-        dept = db.query(Department).filter_by(name=dept_name).first()
-        if not dept:
-            dept = Department(name=dept_name)
-            db.add(dept)
-            db.flush()  # assign .id without committing
-            print(f"  [+] Department: {dept_name}")
-        else:
-            print(f"  [=] Department exists: {dept_name}")
-        dept_map[dept_name] = dept
-
-    # --- Tasks ---
-    for dept_name, task_list in TASKS_BY_DEPT.items():
-        dept = dept_map[dept_name]
-        for task_data in task_list:
-            task = db.query(Task).filter_by(task_key=task_data["task_key"]).first()
-            if not task:
-                task = Task(
-                    task_key=task_data["task_key"],
-                    title=task_data["title"],
-                    description=task_data["description"],
-                    order=task_data["order"],
-                    department_id=dept.id,
-                )
-                db.add(task)
-                print(f"  [+] Task: {task_data['task_key']} ({dept_name})")
+    """
+    Insert departments, tasks, and employees. Skip rows that already exist.
+    `db` must not have a transaction in progress.
+
+    Existing keys are read with one IN (...) SELECT per table, limited to the
+    seed keys, and new rows go in with one executemany INSERT per table, so a
+    run costs a handful of round trips regardless of table or seed size.
+    """
+    report: list[str] = []
+
+    # One explicit transaction for all three phases: a single commit (and
+    # fsync) on exit, rolled back as a whole if any INSERT fails.
+    with db.begin():
+        # --- Departments ---
+        # New department ids come back from the INSERT itself (RETURNING, or
+        # OUTPUT on SQL Server), so no flush or re-select is needed for FK wiring.
+        dept_map: dict[str, int] = {
+            name: dept_id
+            for dept_id, name in db.execute(
+                select(Department.id, Department.name).where(Department.name.in_(DEPARTMENTS))
+            )
+        }
+        new_depts = [{"name": name} for name in DEPARTMENTS if name not in dept_map]
+        for dept_name in DEPARTMENTS:
+            if dept_name in dept_map:
+                report.append(f"  [=] Department exists: {dept_name}")
             else:
-                print(f"  [=] Task exists: {task_data['task_key']}")
-
-    # --- Employees ---
-    for emp_data in EMPLOYEES:
-        emp = db.query(Employee).filter_by(name=emp_data["name"]).first()
-        if not emp:
-            dept = dept_map[emp_data["department"]]
-            emp = Employee(
-                name=emp_data["name"],
-                full_name=emp_data["full_name"],
-                department_id=dept.id,
-                manager=emp_data["manager"],
-                team=emp_data["team"],
-                start_date=emp_data["start_date"],
-                office=emp_data["office"],
+                report.append(f"  [+] Department: {dept_name}")
+        if new_depts:
+            inserted = db.execute(
+                insert(Department).returning(Department.id, Department.name), new_depts
             )
-            db.add(emp)
-            print(f"  [+] Employee: {emp_data['name']}")
-        else:
-            print(f"  [=] Employee exists: {emp_data['name']}")
+            dept_map.update({name: dept_id for dept_id, name in inserted})
 
-    db.commit()
+        # --- Tasks ---
+        wanted_keys = [t["task_key"] for task_list in TASKS_BY_DEPT.values() for t in task_list]
+        existing_keys = set(
+            db.scalars(select(Task.task_key).where(Task.task_key.in_(wanted_keys))).all()
+        )
+        new_tasks = []
+        for dept_name, task_list in TASKS_BY_DEPT.items():
+            for task_data in task_list:
+                if task_data["task_key"] in existing_keys:
+                    report.append(f"  [=] Task exists: {task_data['task_key']}")
+                    continue
+                new_tasks.append({**task_data, "department_id": dept_map[dept_name]})
+                report.append(f"  [+] Task: {task_data['task_key']} ({dept_name})")
+        if new_tasks:
+            db.execute(insert(Task), new_tasks)
+
+        # --- Employees ---
+        wanted_names = [emp["name"] for emp in EMPLOYEES]
+        existing_emps = set(
+            db.scalars(select(Employee.name).where(Employee.name.in_(wanted_names))).all()
+        )
+        new_emps = []
+        for emp_data in EMPLOYEES:
+            if emp_data["name"] in existing_emps:
+                report.append(f"  [=] Employee exists: {emp_data['name']}")
+                continue
+            new_emps.append({
+                "name": emp_data["name"],
+                "full_name": emp_data["full_name"],
+                "department_id": dept_map[emp_data["department"]],
+                "manager": emp_data["manager"],
+                "team": emp_data["team"],
+                "start_date": date.fromisoformat(emp_data["start_date"]),
+                "office": emp_data["office"],
+            })
+            report.append(f"  [+] Employee: {emp_data['name']}")
+        if new_emps:
+            db.execute(insert(Employee), new_emps)
+
+    # One write for the whole report instead of a print per row.
+    print("\n".join(report))
     print("\nSeed complete.")
 
 
 def reset_completions(db) -> None:
-    """Delete all TaskCompletion rows — resets all task progress without touching data."""
-    deleted = db.query(TaskCompletion).delete()
+    """
+    Delete all TaskCompletion rows — resets all task progress without touching data.
+
+    Postgres gets TRUNCATE (constant time, no per-row WAL); elsewhere a Core
+    DELETE, which skips the ORM's identity-map synchronisation.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("TRUNCATE TABLE task_completions"))
+        db.commit()
+        _invalidate_response_cache()
+        print("Cleared all completion records.")
+        return
+
+    deleted = db.execute(
+        delete(TaskCompletion).execution_options(synchronize_session=False)
+    ).rowcount
     db.commit()
+    _invalidate_response_cache()
     print(f"Cleared {deleted} completion record(s).")
 
 
+def _invalidate_response_cache() -> None:
+    """Retire every cached GET /onboarding body (the cache only exists with REDIS_URL)."""
+    if not os.environ.get("REDIS_URL", "").strip():
+        return
+    from app import app, invalidate_onboarding_cache
+    with app.app_context():
+        invalidate_onboarding_cache()
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------